@@ -1,8 +1,8 @@
 from datetime import datetime
-from typing import Annotated, Optional
+from typing import Annotated, Any, Optional
 
 from fastapi import Depends
-from sqlalchemy import select
+from sqlalchemy import insert, select
 
 from bartender.db.dependencies import CurrentSession
 from bartender.db.models.job_model import Job, State
@@ -48,6 +48,35 @@ class JobDAO:
         await self.session.commit()
         return job.id
 
+    async def bulk_create_jobs(self, specs: list[dict[str, Any]]) -> list[int]:
+        """Add multiple jobs with bulk INSERT ... RETURNING.
+
+        Columns whose value is None are left out of a row,
+        so the database default is used.
+        The ORM groups rows by the columns they fill,
+        so specs with different keys are inserted with one statement per group.
+
+        Args:
+            specs: Column values of each job.
+                Keys are column names of the job table,
+                so a job can be inserted with its internal id,
+                destination and state already filled.
+                A key that is not a column raises a ValueError.
+
+        Returns:
+            ids of the jobs, in the same order as specs.
+        """
+        if not specs:
+            return []
+        rows = [_job_row(spec) for spec in specs]
+        result = await self.session.scalars(
+            insert(Job).returning(Job.id, sort_by_parameter_order=True),
+            rows,
+        )
+        job_ids = list(result.all())
+        await self.session.commit()
+        return job_ids
+
     async def get_all_jobs(self, limit: int, offset: int, user: str) -> list[Job]:
         """Get all job models of user with limit/offset pagination.
 
@@ -154,4 +183,15 @@ class JobDAO:
         await self.session.commit()
 
 
+def _job_row(spec: dict[str, Any]) -> dict[str, Any]:
+    unknown = sorted(spec.keys() - Job.__table__.columns.keys())
+    if unknown:
+        # Specs are untyped, so catch a typo in a key here instead of in SQL
+        raise ValueError(f"Unknown job columns: {unknown}")
+    # Leave out None values so column defaults are used, like in create_job
+    row = {key: value for key, value in spec.items() if value is not None}
+    row.setdefault("name", "")
+    return row
+
+
 CurrentJobDAO = Annotated[JobDAO, Depends()]
@@ -30,7 +30,7 @@ State = Literal[
     Look at stdout/stderr/returncode to get more information.
 """  # noqa: WPS428
 
-CompletedStates: set[State] = {"ok", "error"}
+CompletedStates: frozenset[State] = frozenset(("ok", "error"))
 
 MAX_LENGTH_NAME = 200
 
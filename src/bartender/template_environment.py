@@ -1,7 +1,8 @@
 """Jinja2 template environment for validating and rendering templates."""
+from functools import lru_cache
 from shlex import quote
 
-from jinja2 import Environment
+from jinja2 import Environment, Template
 
 template_environment = (
     Environment(  # noqa: S701 -- used to generate shell commands not HTML
@@ -12,3 +13,19 @@ template_environment = (
 )
 # TODO find way to always quote variables without having to use q filter
 template_environment.filters["q"] = lambda variable: quote(str(variable))
+
+
+@lru_cache
+def compile_template(source: str) -> Template:
+    """Compile a template string with the template environment.
+
+    Command templates come from the configuration and are few,
+    so compiled templates are cached by their source.
+
+    Args:
+        source: The Jinja2 template string.
+
+    Returns:
+        The compiled template.
+    """
+    return template_environment.from_string(source)
@@ -5,7 +5,7 @@ from bartender.context import Context
 from bartender.db.dao.job_dao import JobDAO
 from bartender.filesystems.abstract import AbstractFileSystem
 from bartender.schedulers.abstract import JobDescription, JobSubmissionError
-from bartender.template_environment import template_environment
+from bartender.template_environment import compile_template
 from bartender.web.users import User
 
 
@@ -29,7 +29,7 @@ def build_description(
     Returns:
         Job description containing the job directory and command.
     """
-    template = template_environment.from_string(config.command_template)
+    template = compile_template(config.command_template)
     command = template.render(**payload)
     return JobDescription(
         job_dir=job_dir,
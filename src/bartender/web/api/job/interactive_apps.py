@@ -1,8 +1,10 @@
 """Module for running interactive applications."""
+import json
 from asyncio import create_subprocess_shell, wait_for
 from asyncio.subprocess import PIPE
 from base64 import b64decode
 from contextlib import asynccontextmanager
+from hashlib import blake2b
 from os.path import join
 from pathlib import Path
 from typing import Any, AsyncGenerator, Literal, Union
@@ -13,7 +15,7 @@ from jsonschema import Draft202012Validator
 from pydantic import BaseModel
 
 from bartender.config import InteractiveApplicationConfiguration
-from bartender.template_environment import template_environment
+from bartender.template_environment import compile_template
 
 
 class InteractiveAppResult(BaseModel):
@@ -56,6 +58,30 @@ async def _shell(job_dir: Path, command: str, timeout: float) -> InteractiveAppR
     )
 
 
+_validators: dict[bytes, Draft202012Validator] = {}
+
+
+def _get_validator(schema: dict[Any, Any]) -> Draft202012Validator:
+    """Get validator for a JSON schema.
+
+    Validators are cached by a digest of the schema,
+    so identical schemas share a validator.
+
+    Args:
+        schema: The JSON schema.
+
+    Returns:
+        The validator for the schema.
+    """
+    canonical_schema = json.dumps(schema, sort_keys=True)
+    key = blake2b(canonical_schema.encode()).digest()
+    validator = _validators.get(key)
+    if validator is None:
+        validator = Draft202012Validator(schema)
+        _validators[key] = validator
+    return validator
+
+
 def build_command(
     payload: dict[Any, Any],
     app: InteractiveApplicationConfiguration,
@@ -69,13 +95,28 @@ def build_command(
     Returns:
         str: A string representing the command to be executed.
     """
-    validator = Draft202012Validator(app.input_schema)
-    validator.validate(payload)
+    _get_validator(app.input_schema).validate(payload)
 
-    template = template_environment.from_string(app.command_template)
+    if _is_static(app.command_template):
+        return app.command_template
+    template = compile_template(app.command_template)
     return template.render(**payload)
 
 
+def _is_static(template: str) -> bool:
+    """Check whether rendering a template would return it unchanged.
+
+    Args:
+        template: The Jinja2 template string.
+
+    Returns:
+        True if template has no Jinja2 syntax and no newlines,
+        which Jinja2 could normalize or strip.
+    """
+    markers = ("{{", "{%", "{#", "\n", "\r")
+    return not any(marker in template for marker in markers)
+
+
 MediaEncoding = Union[Literal["base64"], Literal["utf-8"]]
 
 
@@ -123,7 +123,7 @@ async def retrieve_job(
         ) from exc
 
 
-def get_job_dir(
+async def get_job_dir(
     jobid: int,
     job_root_dir: Annotated[Path, Depends(get_job_root_dir)],
 ) -> Path:
@@ -143,7 +143,7 @@ def get_job_dir(
     return Path(job_dir)
 
 
-def get_dir_of_completed_job(
+async def get_dir_of_completed_job(
     job: Annotated[Job, Depends(retrieve_job)],
     job_dir: Annotated[Path, Depends(get_job_dir)],
 ) -> Path:
@@ -219,7 +219,7 @@ def retrieve_job_file(
 CurrentJob = Annotated[Job, Depends(retrieve_job)]
 
 
-def get_destination(
+async def get_destination(
     job: CurrentJob,
     context: CurrentContext,
 ) -> Destination:
@@ -292,7 +292,7 @@ async def retrieve_job_stdout(
 
 
 @router.get("/{jobid}/stderr", response_class=PlainTextResponse)
-def retrieve_job_stderr(
+async def retrieve_job_stderr(
     logs: CurrentLogs,
 ) -> str:
     """Retrieve the jobs standard error.
@@ -470,7 +470,7 @@ def _parse_subdirectory(path: str, job_dir: Path) -> Path:
     return job_dir / path
 
 
-def get_interactive_app(
+async def get_interactive_app(
     application: str,
     config: CurrentConfig,
 ) -> InteractiveApplicationConfiguration:
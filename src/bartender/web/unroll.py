@@ -9,6 +9,12 @@ from bartender.config import (
     InteractiveApplicationConfigurations,
 )
 
+_UPLOAD_PROP = {
+    "type": "string",
+    "format": "binary",
+    "title": "Upload",
+}
+
 
 def unroll_openapi(app: FastAPI) -> None:
     """Convert dynamic application routes to static routes.
@@ -137,14 +143,7 @@ def unroll_application_request_schema(
     if config.upload_needs:
         needed_files = ", ".join(config.upload_needs)
         desc = f"Zip archive containing {needed_files} file(s)."
-    properties = {
-        "upload": {
-            "type": "string",
-            "format": "binary",
-            "title": "Upload",
-            "description": desc,
-        },
-    }
+    properties = {"upload": {**_UPLOAD_PROP, "description": desc}}
     required = ["upload"]
     if config.input_schema is not None:
         properties.update(config.input_schema.get("properties", {}))
@@ -4,7 +4,7 @@ from typing import Any, AsyncGenerator, Callable, Dict, Generator
 
 import pytest
 from fastapi import FastAPI
-from httpx import AsyncClient
+from httpx import ASGITransport, AsyncClient
 from rsa.key import PrivateKey, PublicKey
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
@@ -214,20 +214,43 @@ def demo_jwt_decoder(rsa_publc_key: bytes) -> JwtDecoder:
     return JwtDecoder.from_bytes(rsa_publc_key)
 
 
+@pytest.fixture(scope="session")
+def _fastapi_app() -> FastAPI:
+    """Create FastAPI app once for all tests.
+
+    Returns:
+        fastapi app without mocked dependencies.
+    """
+    return get_app()
+
+
 @pytest.fixture
 async def fastapi_app(
+    _fastapi_app: FastAPI,
     dbsession: AsyncSession,
     demo_config: Config,
     demo_context: Context,
     demo_file_staging_queue: FileStagingQueue,
     demo_jwt_decoder: JwtDecoder,
-) -> FastAPI:
-    """Fixture for creating FastAPI app.
+) -> AsyncGenerator[FastAPI, None]:
+    """Fixture for FastAPI app with mocked dependencies.
 
-    Returns:
+    The dependencies are only mocked for the duration of the test.
+    Any other changes the test made to the shared app are undone afterwards.
+
+    Args:
+        _fastapi_app: the application shared by all tests.
+        dbsession: async session.
+        demo_config: the configuration.
+        demo_context: the context.
+        demo_file_staging_queue: the file staging queue.
+        demo_jwt_decoder: the JWT decoder.
+
+    Yields:
         fastapi app with mocked dependencies.
     """
-    application = get_app()
+    application = _fastapi_app
+    overrides = dict(application.dependency_overrides)
     application.dependency_overrides[get_db_session] = lambda: dbsession
     application.dependency_overrides[get_config] = lambda: demo_config
     application.dependency_overrides[get_context] = lambda: demo_context
@@ -235,23 +258,44 @@ async def fastapi_app(
         get_file_staging_queue
     ] = lambda: demo_file_staging_queue
     application.dependency_overrides[get_jwt_decoder] = lambda: demo_jwt_decoder
-    return application
+    yield application
+    application.dependency_overrides.clear()
+    application.dependency_overrides.update(overrides)
+
+
+@pytest.fixture(scope="session")
+def _asgi_transport(_fastapi_app: FastAPI) -> ASGITransport:
+    """Create transport to the app once for all tests.
+
+    Args:
+        _fastapi_app: the application shared by all tests.
+
+    Returns:
+        transport that calls the app in-process.
+    """
+    return ASGITransport(app=_fastapi_app)
 
 
 @pytest.fixture
 async def client(
     fastapi_app: FastAPI,
+    _asgi_transport: ASGITransport,
     anyio_backend: Any,
 ) -> AsyncGenerator[AsyncClient, None]:
     """Fixture that creates client for requesting server.
 
     Args:
-        fastapi_app: the application.
+        fastapi_app: the application with mocked dependencies.
+        _asgi_transport: the transport shared by all tests.
 
     Yields:
         client for the app.
     """
-    async with AsyncClient(app=fastapi_app, base_url="http://test", timeout=60) as ac:
+    async with AsyncClient(
+        transport=_asgi_transport,
+        base_url="http://test",
+        timeout=60,
+    ) as ac:
         yield ac
 
 
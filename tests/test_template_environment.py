@@ -0,0 +1,17 @@
+from bartender.template_environment import compile_template, template_environment
+
+
+def test_q_filter() -> None:
+    template = template_environment.from_string("echo {{ message|q }}")
+
+    command = template.render(message="hello; rm -rf /")
+
+    assert command == "echo 'hello; rm -rf /'"
+
+
+def test_compile_template_reused() -> None:
+    template1 = compile_template("echo {{ message|q }}")
+    template2 = compile_template("echo {{ message|q }}")
+
+    assert template1 is template2
+    assert template1.render(message="a b") == "echo 'a b'"
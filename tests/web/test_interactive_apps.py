@@ -6,9 +6,10 @@ from typing import Any
 import pytest
 from jsonschema import ValidationError
 
-from bartender.web.api.job.interactive_apps import (
+from bartender.web.api.job.interactive_apps import (  # noqa: WPS450
     InteractiveApplicationConfiguration,
     InteractiveAppResult,
+    _get_validator,
     build_command,
     run,
 )
@@ -130,6 +131,34 @@ def test_build_command_optional_field(payload: dict[Any, Any], expected: str) ->
     assert command == expected
 
 
+@pytest.mark.parametrize(
+    "command_template, expected",
+    [
+        ("echo hello", "echo hello"),
+        ("echo {'a': 1}", "echo {'a': 1}"),
+        # Jinja2 strips a single trailing newline
+        ("echo hello\n", "echo hello"),
+        ("echo {# comment #}hello", "echo hello"),
+    ],
+)
+def test_build_command_static(command_template: str, expected: str) -> None:
+    config = InteractiveApplicationConfiguration(
+        command_template=command_template,
+        input_schema={"type": "object"},
+    )
+
+    command = build_command({}, config)
+
+    assert command == expected
+
+
+def test_get_validator_reused_for_equal_schemas() -> None:
+    schema1 = {"type": "object", "properties": {"a": {"type": "string"}}}
+    schema2 = {"properties": {"a": {"type": "string"}}, "type": "object"}
+
+    assert _get_validator(schema1) is _get_validator(schema2)
+
+
 def test_build_command_lookup() -> None:
     template = """\
         {% set flag = {
@@ -1,13 +1,15 @@
 import io
+import os
+import tarfile
+import zipfile
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Optional
-from unittest.mock import Mock
+from shutil import copytree
+from typing import Any, Dict, Optional
 
 import pytest
 from fastapi import FastAPI, HTTPException
-from fs.tarfs import TarFS
-from fs.zipfs import ZipFS
+from fastapi.routing import APIRoute
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
@@ -24,6 +26,37 @@ from bartender.user import User
 from bartender.web.api.job.views import delete_job, retrieve_job, retrieve_jobs
 
 somedt = datetime(2022, 1, 1, tzinfo=timezone.utc)
+ok_job_files = (
+    ("somefile.txt", b"hello"),
+    ("stderr.txt", b"this is stderr"),
+    ("stdout.txt", b"this is stdout"),
+    ("output/readme.txt", b"hi from output dir"),
+)
+
+
+def job_spec(
+    current_user: User,
+    name: str = "testjob1",
+    **columns: Any,
+) -> dict[str, Any]:
+    return {
+        "name": name,
+        "application": "app1",
+        "submitter": current_user.username,
+        "created_on": somedt,
+        "updated_on": somedt,
+        **columns,
+    }
+
+
+@pytest.fixture(scope="module")
+def job_urls(_fastapi_app: FastAPI) -> dict[str, str]:
+    """URL templates by route name, fill in path parameters with str.format."""
+    return {
+        route.name: route.path_format
+        for route in _fastapi_app.routes
+        if isinstance(route, APIRoute)
+    }
 
 
 @pytest.fixture
@@ -34,44 +67,54 @@ async def mock_db_of_job(
     """Fixture that inserts single new job into db."""
     # This mock is incomplete as it only does db stuff, it excludes staging of files
     dao = JobDAO(dbsession)
-    return await dao.create_job(
-        name="testjob1",
-        application="app1",
-        submitter=current_user.username,
-        created_on=somedt,
-        updated_on=somedt,
-    )
+    job_ids = await dao.bulk_create_jobs([job_spec(current_user)])
+    return job_ids[0]
+
+
+@pytest.fixture(scope="session")
+def ok_job_dir_template(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Job directory of a completed job, hardlinked into place by mock_ok_job."""
+    job_dir = tmp_path_factory.mktemp("ok_job_dir_template")
+    os.makedirs(job_dir / "output")
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+    for path, content in ok_job_files:
+        fd = os.open(job_dir / path, flags, 0o644)
+        try:
+            os.write(fd, content)
+        finally:
+            os.close(fd)
+    return job_dir
 
 
 @pytest.fixture
 async def mock_ok_job(
     dbsession: AsyncSession,
-    mock_db_of_job: int,
+    current_user: User,
     job_root_dir: Path,
+    ok_job_dir_template: Path,
 ) -> int:
-    job_id = mock_db_of_job
     dao = JobDAO(dbsession)
-    await dao.update_internal_job_id(job_id, "internal-job-id", "dest1")
-    await dao.update_job_state(job_id, "ok")
-    job_dir = job_root_dir / str(job_id)
-    job_dir.mkdir()
-    (job_dir / "somefile.txt").write_text("hello")
-    (job_dir / "stderr.txt").write_text("this is stderr")
-    (job_dir / "stdout.txt").write_text("this is stdout")
-
-    job_subdir = job_dir / "output"
-    job_subdir.mkdir()
-    (job_subdir / "readme.txt").write_text("hi from output dir")
+    spec = job_spec(
+        current_user,
+        internal_id="internal-job-id",
+        destination="dest1",
+        state="ok",
+    )
+    job_ids = await dao.bulk_create_jobs([spec])
+    job_id = job_ids[0]
+    # Tests only add or unlink entries, never write to the template files,
+    # so the files can be hardlinked instead of copied
+    copytree(ok_job_dir_template, job_root_dir / str(job_id), copy_function=os.link)
     return job_id
 
 
 @pytest.mark.anyio
 async def test_retrieve_jobs_none(
-    fastapi_app: FastAPI,
+    job_urls: dict[str, str],
     client: AsyncClient,
     auth_headers: Dict[str, str],
 ) -> None:
-    retrieve_url = fastapi_app.url_path_for("retrieve_jobs")
+    retrieve_url = job_urls["retrieve_jobs"]
     response = await client.get(retrieve_url, headers=auth_headers)
     jobs = response.json()
     assert not len(jobs)
@@ -79,12 +122,12 @@ async def test_retrieve_jobs_none(
 
 @pytest.mark.anyio
 async def test_retrieve_jobs_one(
-    fastapi_app: FastAPI,
+    job_urls: dict[str, str],
     client: AsyncClient,
     mock_db_of_job: int,
     auth_headers: Dict[str, str],
 ) -> None:
-    retrieve_url = fastapi_app.url_path_for("retrieve_jobs")
+    retrieve_url = job_urls["retrieve_jobs"]
     response = await client.get(retrieve_url, headers=auth_headers)
 
     assert response.status_code == status.HTTP_200_OK
@@ -102,14 +145,50 @@ async def test_retrieve_jobs_one(
     assert jobs == expected
 
 
+@pytest.mark.anyio
+async def test_retrieve_jobs_many(
+    job_urls: dict[str, str],
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    current_user: User,
+    auth_headers: Dict[str, str],
+) -> None:
+    dao = JobDAO(dbsession)
+    names = ["testjob0", "testjob1", "testjob2"]
+    specs = [job_spec(current_user, name=name) for name in names]
+    job_ids = await dao.bulk_create_jobs(specs)
+
+    retrieve_url = job_urls["retrieve_jobs"]
+    response = await client.get(retrieve_url, headers=auth_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    jobs = response.json()
+    # jobs are returned newest first
+    assert job_ids[::-1] == [job["id"] for job in jobs]
+    assert names[::-1] == [job["name"] for job in jobs]
+    assert all(job["state"] == "new" for job in jobs)
+
+
+@pytest.mark.anyio
+async def test_bulk_create_jobs_given_unknown_column(
+    dbsession: AsyncSession,
+    current_user: User,
+) -> None:
+    dao = JobDAO(dbsession)
+    spec = job_spec(current_user, nmae="testjob")
+
+    with pytest.raises(ValueError, match="nmae"):
+        await dao.bulk_create_jobs([spec])
+
+
 @pytest.mark.anyio
 async def test_retrieve_jobs_given_notowner_of_any(
-    fastapi_app: FastAPI,
+    job_urls: dict[str, str],
     client: AsyncClient,
     mock_db_of_job: int,
     second_user_token: str,
 ) -> None:
-    url = fastapi_app.url_path_for("retrieve_jobs")
+    url = job_urls["retrieve_jobs"]
     headers = {"Authorization": f"Bearer {second_user_token}"}
     response = await client.get(url, headers=headers)
 
@@ -119,12 +198,12 @@ async def test_retrieve_jobs_given_notowner_of_any(
 
 @pytest.mark.anyio
 async def test_retrieve_job_badid(
-    fastapi_app: FastAPI,
+    job_urls: dict[str, str],
     client: AsyncClient,
     auth_headers: Dict[str, str],
 ) -> None:
     """Tests job instance retrieval."""
-    url = fastapi_app.url_path_for("retrieve_job", jobid="999999")
+    url = job_urls["retrieve_job"].format(jobid="999999")
     response = await client.get(url, headers=auth_headers)
 
     assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -133,12 +212,12 @@ async def test_retrieve_job_badid(
 
 @pytest.mark.anyio
 async def test_retrieve_job_given_notowner(
-    fastapi_app: FastAPI,
+    job_urls: dict[str, str],
     client: AsyncClient,
     mock_db_of_job: int,
     second_user_token: str,
 ) -> None:
-    url = fastapi_app.url_path_for("retrieve_job", jobid=str(mock_db_of_job))
+    url = job_urls["retrieve_job"].format(jobid=str(mock_db_of_job))
     headers = {"Authorization": f"Bearer {second_user_token}"}
     response = await client.get(url, headers=headers)
 
@@ -148,13 +227,13 @@ async def test_retrieve_job_given_notowner(
 
 @pytest.mark.anyio
 async def test_retrieve_job_new(
-    fastapi_app: FastAPI,
+    job_urls: dict[str, str],
     client: AsyncClient,
     mock_db_of_job: int,
     auth_headers: Dict[str, str],
 ) -> None:
     """Tests job instance retrieval."""
-    url = fastapi_app.url_path_for("retrieve_job", jobid=str(mock_db_of_job))
+    url = job_urls["retrieve_job"].format(jobid=str(mock_db_of_job))
     response = await client.get(url, headers=auth_headers)
 
     assert response.status_code == status.HTTP_200_OK
@@ -172,22 +251,22 @@ async def test_retrieve_job_new(
 
 @pytest.mark.anyio
 async def test_retrieve_job_unknown(
-    fastapi_app: FastAPI,
+    job_urls: dict[str, str],
     client: AsyncClient,
     auth_headers: Dict[str, str],
 ) -> None:
-    url = fastapi_app.url_path_for("retrieve_job", jobid="999999")
+    url = job_urls["retrieve_job"].format(jobid="999999")
     response = await client.get(url, headers=auth_headers)
 
     assert response.status_code == status.HTTP_404_NOT_FOUND
 
 
 async def test_retrieve_job_stdout_unknown(
-    fastapi_app: FastAPI,
+    job_urls: dict[str, str],
     client: AsyncClient,
     auth_headers: Dict[str, str],
 ) -> None:
-    url = fastapi_app.url_path_for("retrieve_job_stdout", jobid="999999")
+    url = job_urls["retrieve_job_stdout"].format(jobid="999999")
     response = await client.get(url, headers=auth_headers)
 
     assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -219,8 +298,8 @@ async def test_retrieve_job_queued2running(
 
     assert job.state == "running"
 
-    filesystem.download_mock.assert_not_called()
-    filesystem.delete_mock.assert_not_called()
+    assert filesystem.download_mock.count == 0
+    assert filesystem.delete_mock.count == 0
 
 
 @pytest.mark.anyio
@@ -248,8 +327,8 @@ async def test_retrieve_job_completed(
     )
 
     assert job.state == "ok"
-    filesystem.download_mock.assert_not_called()
-    filesystem.delete_mock.assert_not_called()
+    assert filesystem.download_mock.count == 0
+    assert filesystem.delete_mock.count == 0
 
 
 @pytest.mark.anyio
@@ -291,8 +370,8 @@ async def test_retrieve_job_running2ok(
 
     assert job2.state == "ok"
 
-    filesystem.download_mock.assert_called_once()
-    filesystem.delete_mock.assert_called_once()
+    assert filesystem.download_mock.count == 1
+    assert filesystem.delete_mock.count == 1
 
 
 @pytest.mark.anyio
@@ -322,8 +401,8 @@ async def test_retrieve_jobs_queued2running(
     assert jobs[0].id == job_id
     assert jobs[0].state == "running"
 
-    filesystem.download_mock.assert_not_called()
-    filesystem.delete_mock.assert_not_called()
+    assert filesystem.download_mock.count == 0
+    assert filesystem.delete_mock.count == 0
 
 
 @pytest.mark.anyio
@@ -356,20 +435,39 @@ async def test_retrieve_jobs_running2staging_out(
     # wait for download task to complete
     await demo_file_staging_queue.join()
 
-    filesystem.download_mock.assert_called_once()
-    filesystem.delete_mock.assert_called_once()
+    assert filesystem.download_mock.count == 1
+    assert filesystem.delete_mock.count == 1
+
+
+class CallCounter:
+    """Records calls like a Mock, without its attribute machinery."""
+
+    __slots__ = ("count", "args")
+    count: int
+    args: tuple[Any, ...]
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def __call__(self, *args: Any) -> None:
+        self.count += 1
+        self.args = args
+
+    def reset(self) -> None:
+        self.count = 0
+        self.args = ()
 
 
 class FakeScheduler(AbstractScheduler):
     def __init__(self, scheduler_state: State) -> None:
         self.scheduler_state = scheduler_state
-        self.cancel_mock = Mock()
+        self.cancel_mock = CallCounter()
 
     async def state(self, job_id: str) -> State:
         return self.scheduler_state
 
     async def states(self, job_ids: list[str]) -> list[State]:
-        return [self.scheduler_state]
+        return [self.scheduler_state for _ in job_ids]
 
     async def submit(self, description: JobDescription) -> str:
         raise NotImplementedError()
@@ -383,8 +481,8 @@ class FakeScheduler(AbstractScheduler):
 
 class FakeFileSystem(AbstractFileSystem):
     def __init__(self) -> None:
-        self.download_mock = Mock()
-        self.delete_mock = Mock()
+        self.download_mock = CallCounter()
+        self.delete_mock = CallCounter()
 
     def localize_description(
         self,
@@ -406,6 +504,34 @@ class FakeFileSystem(AbstractFileSystem):
         raise NotImplementedError()
 
 
+FakeDestination = tuple[Destination, FakeFileSystem, FakeScheduler]
+_destinations: dict[State, FakeDestination] = {}
+
+
+def fake_destination(scheduler_state: State) -> FakeDestination:
+    """Get fake destination for state, reusing the one made by an earlier test.
+
+    Args:
+        scheduler_state: State the fake scheduler reports for every job.
+
+    Returns:
+        Destination with its fake filesystem and scheduler,
+        whose mocks are reset.
+    """
+    fake = _destinations.get(scheduler_state)
+    if fake is None:
+        filesystem = FakeFileSystem()
+        scheduler = FakeScheduler(scheduler_state)
+        destination = Destination(scheduler=scheduler, filesystem=filesystem)
+        fake = (destination, filesystem, scheduler)
+        _destinations[scheduler_state] = fake
+    _, filesystem, scheduler = fake
+    filesystem.download_mock.reset()
+    filesystem.delete_mock.reset()
+    scheduler.cancel_mock.reset()
+    return fake
+
+
 async def prepare_job(
     db_state: State,
     scheduler_state: State,
@@ -413,38 +539,29 @@ async def prepare_job(
     current_user: User,
     demo_context: Context,
 ) -> tuple[int, FakeFileSystem, FakeScheduler]:
-    job_id = await dao.create_job(
-        name="testjob1",
-        application="app1",
-        submitter=current_user.username,
-        created_on=somedt,
-        updated_on=somedt,
-    )
-    if job_id is None:
-        raise NotImplementedError()
-    await dao.update_internal_job_id(job_id, "fake-internal-job-id", "dest1")
-    await dao.update_job_state(job_id, db_state)
-
-    scheduler = FakeScheduler(scheduler_state)
-    filesystem = FakeFileSystem()
-    destination = Destination(
-        scheduler=scheduler,
-        filesystem=filesystem,
+    spec = job_spec(
+        current_user,
+        internal_id="fake-internal-job-id",
+        destination="dest1",
+        state=db_state,
     )
+    job_ids = await dao.bulk_create_jobs([spec])
+    job_id = job_ids[0]
+
+    destination, filesystem, scheduler = fake_destination(scheduler_state)
     demo_context.destinations["dest1"] = destination
     return job_id, filesystem, scheduler
 
 
 @pytest.mark.anyio
 async def test_files_of_noncomplete_job(
-    fastapi_app: FastAPI,
+    job_urls: dict[str, str],
     client: AsyncClient,
     auth_headers: Dict[str, str],
     mock_db_of_job: int,
 ) -> None:
     # mock_db_of_job has state==new
-    url = fastapi_app.url_path_for(
-        "retrieve_job_file",
+    url = job_urls["retrieve_job_file"].format(
         jobid=str(mock_db_of_job),
         path="README.md",
     )
@@ -456,14 +573,14 @@ async def test_files_of_noncomplete_job(
 
 @pytest.mark.anyio
 async def test_files_of_completed_job(
-    fastapi_app: FastAPI,
+    job_urls: dict[str, str],
     client: AsyncClient,
     auth_headers: Dict[str, str],
     mock_ok_job: int,
 ) -> None:
     path = "somefile.txt"
     job_id = str(mock_ok_job)
-    url = fastapi_app.url_path_for("retrieve_job_file", jobid=job_id, path=path)
+    url = job_urls["retrieve_job_file"].format(jobid=job_id, path=path)
     response = await client.get(url, headers=auth_headers)
 
     assert response.status_code == status.HTTP_200_OK
@@ -474,14 +591,14 @@ async def test_files_of_completed_job(
 
 @pytest.mark.anyio
 async def test_files_given_path_is_dir(
-    fastapi_app: FastAPI,
+    job_urls: dict[str, str],
     client: AsyncClient,
     auth_headers: Dict[str, str],
     mock_ok_job: int,
 ) -> None:
     path = ""
     job_id = str(mock_ok_job)
-    url = fastapi_app.url_path_for("retrieve_job_file", jobid=job_id, path=path)
+    url = job_urls["retrieve_job_file"].format(jobid=job_id, path=path)
     response = await client.get(url, headers=auth_headers)
 
     assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -490,7 +607,7 @@ async def test_files_given_path_is_dir(
 
 @pytest.mark.anyio
 async def test_files_given_jobdir_is_symlink(
-    fastapi_app: FastAPI,
+    job_urls: dict[str, str],
     client: AsyncClient,
     auth_headers: Dict[str, str],
     mock_ok_job: int,
@@ -499,75 +616,42 @@ async def test_files_given_jobdir_is_symlink(
     job_id = create_symlinked_job_dir(mock_ok_job, job_root_dir)
 
     path = "somefile.txt"
-    url = fastapi_app.url_path_for("retrieve_job_file", jobid=job_id, path=path)
+    url = job_urls["retrieve_job_file"].format(jobid=job_id, path=path)
     response = await client.get(url, headers=auth_headers)
 
     assert response.status_code == status.HTTP_200_OK
 
 
-@pytest.mark.parametrize(
-    "test_input",
-    [
-        "/etc/passwd",
-        "~/.ssh/id_rsa",
-        # Job dir is <pytest_tmp_path>/jobs/6
-        # to .. up to /etc/passwd use
-        # escape / with %2F as un-escaped will
-        # use resolve to URL that does not exist.
-        "..%2F..%2F..%2F..%2F..%2F..%2Fetc%2Fpasswd",  # noqa: WPS323
-    ],
-)
 @pytest.mark.anyio
 async def test_files_given_bad_paths(
-    fastapi_app: FastAPI,
-    client: AsyncClient,
-    auth_headers: Dict[str, str],
-    mock_ok_job: int,
-    test_input: str,
-) -> None:
-    job_id = str(mock_ok_job)
-    url = fastapi_app.url_path_for("retrieve_job_file", jobid=job_id, path=test_input)
-    response = await client.get(url, headers=auth_headers)
-
-    assert response.status_code == status.HTTP_404_NOT_FOUND
-    assert response.json() == {"detail": "File not found"}
-
-
-@pytest.mark.anyio
-async def test_stdout(
-    fastapi_app: FastAPI,
+    job_urls: dict[str, str],
     client: AsyncClient,
     auth_headers: Dict[str, str],
     mock_ok_job: int,
 ) -> None:
     job_id = str(mock_ok_job)
-    url = fastapi_app.url_path_for("retrieve_job_stdout", jobid=job_id)
-    response = await client.get(url, headers=auth_headers)
-
-    assert response.status_code == status.HTTP_200_OK
-    assert response.text == "this is stdout"
-    assert response.headers["content-type"] == "text/plain; charset=utf-8"
-
-
-@pytest.mark.anyio
-async def test_stderr(
-    fastapi_app: FastAPI,
-    client: AsyncClient,
-    auth_headers: Dict[str, str],
-    mock_ok_job: int,
-) -> None:
-    job_id = str(mock_ok_job)
-    url = fastapi_app.url_path_for("retrieve_job_stderr", jobid=job_id)
-    response = await client.get(url, headers=auth_headers)
+    bad_paths = [
+        "/etc/passwd",
+        "~/.ssh/id_rsa",
+        # Job dir is <pytest_tmp_path>/jobs/6
+        # to .. up to /etc/passwd use
+        # escape / with %2F as un-escaped will
+        # use resolve to URL that does not exist.
+        "..%2F..%2F..%2F..%2F..%2F..%2Fetc%2Fpasswd",  # noqa: WPS323
+    ]
+    # Bad paths share one job and are requested one after another,
+    # as requests share the database session
+    for path in bad_paths:
+        url = job_urls["retrieve_job_file"].format(jobid=job_id, path=path)
+        response = await client.get(url, headers=auth_headers)
 
-    assert response.status_code == status.HTTP_200_OK
-    assert response.text == "this is stderr"
-    assert response.headers["content-type"] == "text/plain; charset=utf-8"
+        assert response.status_code == status.HTTP_404_NOT_FOUND, path
+        assert response.json() == {"detail": "File not found"}, path
 
 
 @pytest.mark.anyio
 async def test_stderr_missing(
-    fastapi_app: FastAPI,
+    job_urls: dict[str, str],
     client: AsyncClient,
     auth_headers: Dict[str, str],
     mock_ok_job: int,
@@ -577,7 +661,7 @@ async def test_stderr_missing(
     fn = job_root_dir / str(job_id) / "stderr.txt"
     fn.unlink()
 
-    url = fastapi_app.url_path_for("retrieve_job_stderr", jobid=job_id)
+    url = job_urls["retrieve_job_stderr"].format(jobid=job_id)
     response = await client.get(url, headers=auth_headers)
 
     assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -585,17 +669,37 @@ async def test_stderr_missing(
 
 
 @pytest.mark.anyio
-async def test_directories(
-    fastapi_app: FastAPI,
+async def test_stdout_stderr_directories(  # noqa: WPS218
+    job_urls: dict[str, str],
     client: AsyncClient,
     auth_headers: Dict[str, str],
     mock_ok_job: int,
 ) -> None:
     job_id = str(mock_ok_job)
-    url = fastapi_app.url_path_for("retrieve_job_directories", jobid=job_id)
-    response = await client.get(url, headers=auth_headers)
+    # Requests are independent, so they share one job.
+    # They run one after another as they share the database session.
+    stdout = await client.get(
+        job_urls["retrieve_job_stdout"].format(jobid=job_id),
+        headers=auth_headers,
+    )
+    stderr = await client.get(
+        job_urls["retrieve_job_stderr"].format(jobid=job_id),
+        headers=auth_headers,
+    )
+    directories = await client.get(
+        job_urls["retrieve_job_directories"].format(jobid=job_id),
+        headers=auth_headers,
+    )
 
-    assert response.status_code == status.HTTP_200_OK
+    assert stdout.status_code == status.HTTP_200_OK
+    assert stdout.text == "this is stdout"
+    assert stdout.headers["content-type"] == "text/plain; charset=utf-8"
+
+    assert stderr.status_code == status.HTTP_200_OK
+    assert stderr.text == "this is stderr"
+    assert stderr.headers["content-type"] == "text/plain; charset=utf-8"
+
+    assert directories.status_code == status.HTTP_200_OK
     expected = {
         "name": "",
         "path": ".",
@@ -628,12 +732,12 @@ async def test_directories(
             },
         ],
     }
-    assert response.json() == expected
+    assert directories.json() == expected
 
 
 @pytest.mark.anyio
 async def test_directories_from_path(
-    fastapi_app: FastAPI,
+    job_urls: dict[str, str],
     client: AsyncClient,
     auth_headers: Dict[str, str],
     mock_ok_job: int,
@@ -645,8 +749,7 @@ async def test_directories_from_path(
     dir1.mkdir()
     (dir1 / "somefile1.txt").write_text("some text")
 
-    url = fastapi_app.url_path_for(
-        "retrieve_job_directories_from_path",
+    url = job_urls["retrieve_job_directories_from_path"].format(
         jobid=job_id,
         path="somedir",
     )
@@ -672,7 +775,7 @@ async def test_directories_from_path(
 
 @pytest.mark.anyio
 async def test_directories_from_path_linkedjob(
-    fastapi_app: FastAPI,
+    job_urls: dict[str, str],
     client: AsyncClient,
     auth_headers: Dict[str, str],
     mock_ok_job: int,
@@ -680,8 +783,7 @@ async def test_directories_from_path_linkedjob(
 ) -> None:
     job_id = create_symlinked_job_dir(mock_ok_job, job_root_dir)
 
-    url = fastapi_app.url_path_for(
-        "retrieve_job_directories_from_path",
+    url = job_urls["retrieve_job_directories_from_path"].format(
         jobid=job_id,
         path="somedir",
     )
@@ -717,45 +819,47 @@ def create_symlinked_job_dir(mock_ok_job: int, job_root_dir: Path) -> str:
     return job_id
 
 
+def read_from_archive(content: bytes, archive_format: str, name: str) -> str:
+    # stdlib readers only read the requested member,
+    # instead of indexing the whole archive like fs.zipfs/fs.tarfs do
+    if archive_format == ".zip":
+        with zipfile.ZipFile(io.BytesIO(content)) as zip_archive:
+            return zip_archive.read(name).decode()
+    with tarfile.open(fileobj=io.BytesIO(content), mode="r:*") as tar_archive:
+        member = tar_archive.extractfile(name)
+        if member is None:
+            raise FileNotFoundError(name)
+        return member.read().decode()
+
+
 @pytest.mark.anyio
-@pytest.mark.parametrize(
-    "archive_format",
-    [".zip", ".tar", ".tar.xz", ".tar.gz", ".tar.bz2"],
-)
 async def test_job_directory_as_archive(
-    fastapi_app: FastAPI,
+    job_urls: dict[str, str],
     client: AsyncClient,
     auth_headers: Dict[str, str],
     mock_ok_job: int,
-    archive_format: str,
 ) -> None:
-    url = (
-        fastapi_app.url_path_for(
-            "retrieve_job_directory_as_archive",
-            jobid=mock_ok_job,
+    # Loop over formats in one test so the completed job is only set up once
+    archive_formats = [".zip", ".tar", ".tar.xz", ".tar.gz", ".tar.bz2"]
+    base_url = job_urls["retrieve_job_directory_as_archive"].format(jobid=mock_ok_job)
+    for archive_format in archive_formats:
+        url = f"{base_url}?archive_format={archive_format}"
+        response = await client.get(url, headers=auth_headers)
+
+        expected_content_type = (
+            "application/zip" if archive_format == ".zip" else "application/x-tar"
+        )
+        expected_content_disposition = (
+            f'attachment; filename="{mock_ok_job}{archive_format}"'
         )
-        + f"?archive_format={archive_format}"
-    )
-    response = await client.get(url, headers=auth_headers)
-
-    expected_content_type = (
-        "application/zip" if archive_format == ".zip" else "application/x-tar"
-    )
-    expected_content_disposition = (
-        f'attachment; filename="{mock_ok_job}{archive_format}"'
-    )
-
-    assert response.status_code == status.HTTP_200_OK
-    assert response.headers["content-type"] == expected_content_type
-    assert response.headers["content-disposition"] == expected_content_disposition
 
-    fs = ZipFS if archive_format == ".zip" else TarFS
+        assert response.status_code == status.HTTP_200_OK, archive_format
+        assert response.headers["content-type"] == expected_content_type
+        assert response.headers["content-disposition"] == expected_content_disposition
 
-    with io.BytesIO(response.content) as responsefile:
-        with fs(responsefile) as archive:
-            stdout = archive.readtext("stdout.txt")
+        stdout = read_from_archive(response.content, archive_format, "stdout.txt")
 
-    assert stdout == "this is stdout"
+        assert stdout == "this is stdout", archive_format
 
 
 @pytest.mark.anyio
@@ -764,17 +868,14 @@ async def test_job_directory_as_archive(
     [".zip"],
 )
 async def test_job_directory_as_named_archive(
-    fastapi_app: FastAPI,
+    job_urls: dict[str, str],
     client: AsyncClient,
     auth_headers: Dict[str, str],
     mock_ok_job: int,
     archive_format: str,
 ) -> None:
     url = (
-        fastapi_app.url_path_for(
-            "retrieve_job_directory_as_archive",
-            jobid=mock_ok_job,
-        )
+        job_urls["retrieve_job_directory_as_archive"].format(jobid=mock_ok_job)
         + f"?archive_format={archive_format}&filename=foo.zip"
     )
     response = await client.get(url, headers=auth_headers)
@@ -788,24 +889,19 @@ async def test_job_directory_as_named_archive(
     assert response.headers["content-type"] == expected_content_type
     assert response.headers["content-disposition"] == expected_content_disposition
 
-    fs = ZipFS if archive_format == ".zip" else TarFS
-
-    with io.BytesIO(response.content) as responsefile:
-        with fs(responsefile) as archive:
-            stdout = archive.readtext("stdout.txt")
+    stdout = read_from_archive(response.content, archive_format, "stdout.txt")
 
     assert stdout == "this is stdout"
 
 
 @pytest.mark.anyio
 async def test_job_subdirectory_as_archive(
-    fastapi_app: FastAPI,
+    job_urls: dict[str, str],
     client: AsyncClient,
     auth_headers: Dict[str, str],
     mock_ok_job: int,
 ) -> None:
-    url = fastapi_app.url_path_for(
-        "retrieve_job_subdirectory_as_archive",
+    url = job_urls["retrieve_job_subdirectory_as_archive"].format(
         jobid=mock_ok_job,
         path="output",
     )
@@ -817,23 +913,20 @@ async def test_job_subdirectory_as_archive(
         response.headers["content-disposition"] == 'attachment; filename="output.zip"'
     )
 
-    with io.BytesIO(response.content) as responsefile:
-        with ZipFS(responsefile) as archive:
-            stdout = archive.readtext("readme.txt")
+    stdout = read_from_archive(response.content, ".zip", "readme.txt")
 
     assert stdout == "hi from output dir"
 
 
 @pytest.mark.anyio
 async def test_job_subdirectory_as_named_archive(
-    fastapi_app: FastAPI,
+    job_urls: dict[str, str],
     client: AsyncClient,
     auth_headers: Dict[str, str],
     mock_ok_job: int,
 ) -> None:
     url = (
-        fastapi_app.url_path_for(
-            "retrieve_job_subdirectory_as_archive",
+        job_urls["retrieve_job_subdirectory_as_archive"].format(
             jobid=mock_ok_job,
             path="output",
         )
@@ -845,9 +938,7 @@ async def test_job_subdirectory_as_named_archive(
     assert response.headers["content-type"] == "application/zip"
     assert response.headers["content-disposition"] == 'attachment; filename="bar.zip"'
 
-    with io.BytesIO(response.content) as responsefile:
-        with ZipFS(responsefile) as archive:
-            stdout = archive.readtext("readme.txt")
+    stdout = read_from_archive(response.content, ".zip", "readme.txt")
 
     assert stdout == "hi from output dir"
 
@@ -870,7 +961,7 @@ def demo_interactive_application(
 
 @pytest.mark.anyio
 async def test_run_interactive_app_invalid_jobapp(
-    fastapi_app: FastAPI,
+    job_urls: dict[str, str],
     client: AsyncClient,
     auth_headers: Dict[str, str],
     mock_ok_job: int,
@@ -888,11 +979,7 @@ async def test_run_interactive_app_invalid_jobapp(
     demo_config.interactive_applications["wcm"] = config
     job_id = str(mock_ok_job)
 
-    url = fastapi_app.url_path_for(
-        "run_interactive_app",
-        jobid=job_id,
-        application="wcm",
-    )
+    url = job_urls["run_interactive_app"].format(jobid=job_id, application="wcm")
     response = await client.post(url, headers=auth_headers)
 
     assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -901,7 +988,7 @@ async def test_run_interactive_app_invalid_jobapp(
 
 @pytest.mark.anyio
 async def test_run_interactive_app_invalid_requestbody(
-    fastapi_app: FastAPI,
+    job_urls: dict[str, str],
     client: AsyncClient,
     auth_headers: Dict[str, str],
     mock_ok_job: int,
@@ -920,11 +1007,7 @@ async def test_run_interactive_app_invalid_requestbody(
     demo_config.interactive_applications["wcm"] = config
     job_id = str(mock_ok_job)
 
-    url = fastapi_app.url_path_for(
-        "run_interactive_app",
-        jobid=job_id,
-        application="wcm",
-    )
+    url = job_urls["run_interactive_app"].format(jobid=job_id, application="wcm")
     response = await client.post(url, headers=auth_headers, json={"foo": "bar"})
 
     assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -935,17 +1018,17 @@ async def test_run_interactive_app_invalid_requestbody(
 
 @pytest.mark.anyio
 async def test_rename_job_name(
-    fastapi_app: FastAPI,
+    job_urls: dict[str, str],
     client: AsyncClient,
     auth_headers: Dict[str, str],
     mock_ok_job: int,
 ) -> None:
-    url = fastapi_app.url_path_for("rename_job_name", jobid=str(mock_ok_job))
+    url = job_urls["rename_job_name"].format(jobid=str(mock_ok_job))
     response = await client.post(url, headers=auth_headers, json="newname")
 
     assert response.status_code == status.HTTP_200_OK
 
-    url = fastapi_app.url_path_for("retrieve_job", jobid=str(mock_ok_job))
+    url = job_urls["retrieve_job"].format(jobid=str(mock_ok_job))
     response2 = await client.get(url, headers=auth_headers)
     assert response2.status_code == status.HTTP_200_OK
 
@@ -955,14 +1038,14 @@ async def test_rename_job_name(
 
 @pytest.mark.anyio
 async def test_rename_job_name_too_short(
-    fastapi_app: FastAPI,
+    job_urls: dict[str, str],
     client: AsyncClient,
     auth_headers: Dict[str, str],
     mock_ok_job: int,
 ) -> None:
     jobid = str(mock_ok_job)
     name = ""
-    url = fastapi_app.url_path_for("rename_job_name", jobid=jobid)
+    url = job_urls["rename_job_name"].format(jobid=jobid)
     response = await client.post(url, headers=auth_headers, json=name)
 
     assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -981,14 +1064,14 @@ async def test_rename_job_name_too_short(
 
 @pytest.mark.anyio
 async def test_rename_job_name_wrong_user(
-    fastapi_app: FastAPI,
+    job_urls: dict[str, str],
     client: AsyncClient,
     second_user_token: str,
     mock_ok_job: int,
 ) -> None:
     jobid = str(mock_ok_job)
     name = "newname"
-    url = fastapi_app.url_path_for("rename_job_name", jobid=jobid)
+    url = job_urls["rename_job_name"].format(jobid=jobid)
     headers = {"Authorization": f"Bearer {second_user_token}"}
     response = await client.post(url, headers=headers, json=name)
 
@@ -998,14 +1081,14 @@ async def test_rename_job_name_wrong_user(
 
 @pytest.mark.anyio
 async def test_delete_completed_job(
-    fastapi_app: FastAPI,
+    job_urls: dict[str, str],
     client: AsyncClient,
     auth_headers: Dict[str, str],
     mock_ok_job: int,
     job_root_dir: Path,
 ) -> None:
     job_id = str(mock_ok_job)
-    url = fastapi_app.url_path_for("delete_job", jobid=job_id)
+    url = job_urls["delete_job"].format(jobid=job_id)
     response = await client.delete(url, headers=auth_headers)
 
     assert response.status_code == status.HTTP_204_NO_CONTENT
@@ -1052,8 +1135,9 @@ async def test_delete_running_job(
         job_root_dir=demo_context.job_root_dir,
     )
 
-    scheduler.cancel_mock.assert_called_once_with("fake-internal-job-id")
-    filesystem.delete_mock.assert_called_once()
+    assert scheduler.cancel_mock.count == 1
+    assert scheduler.cancel_mock.args == ("fake-internal-job-id",)
+    assert filesystem.delete_mock.count == 1
 
 
 @pytest.mark.anyio
@@ -1097,7 +1181,7 @@ async def test_delete_staging_out_job(
 
 @pytest.mark.anyio
 async def test_delete_linkedjob(
-    fastapi_app: FastAPI,
+    job_urls: dict[str, str],
     client: AsyncClient,
     auth_headers: Dict[str, str],
     mock_ok_job: int,
@@ -1105,10 +1189,7 @@ async def test_delete_linkedjob(
 ) -> None:
     job_id = create_symlinked_job_dir(mock_ok_job, job_root_dir)
 
-    url = fastapi_app.url_path_for(
-        "delete_job",
-        jobid=job_id,
-    )
+    url = job_urls["delete_job"].format(jobid=job_id)
     response = await client.delete(url, headers=auth_headers)
 
     assert response.status_code == status.HTTP_204_NO_CONTENT
@@ -1,5 +1,10 @@
+from typing import AsyncGenerator
+
 import pytest
 
+from bartender.filesystems.dirac import DiracFileSystem, DiracFileSystemConfig
+from bartender.schedulers.dirac import DiracScheduler, DiracSchedulerConfig
+
 
 @pytest.fixture(scope="session")
 def anyio_backend() -> str:
@@ -9,3 +14,41 @@ def anyio_backend() -> str:
         backend name.
     """
     return "asyncio"
+
+
+# Module scoped instead of session scoped,
+# because the proxy renewer they share is a global which
+# test_renewer.py sets up and tears down itself.
+@pytest.fixture(scope="module")
+async def dirac_fs() -> AsyncGenerator[DiracFileSystem, None]:
+    """DIRAC filesystem shared by tests of a module.
+
+    Yields:
+        DIRAC filesystem.
+    """
+    config = DiracFileSystemConfig(
+        lfn_root="/tutoVO/user/c/ciuser/bartenderjobs",
+        storage_element="StorageElementOne",
+    )
+    fs = DiracFileSystem(config)
+    try:
+        yield fs
+    finally:
+        await fs.close()
+
+
+@pytest.fixture(scope="module")
+async def dirac_scheduler(
+    dirac_fs: DiracFileSystem,
+) -> AsyncGenerator[DiracScheduler, None]:
+    """DIRAC scheduler shared by tests of a module.
+
+    Yields:
+        DIRAC scheduler.
+    """
+    config = DiracSchedulerConfig(storage_element=dirac_fs.storage_element)
+    scheduler = DiracScheduler(config)
+    try:
+        yield scheduler
+    finally:
+        await scheduler.close()
@@ -1,51 +1,93 @@
-from asyncio import sleep
+import os
+from asyncio import create_task, gather, sleep, wait
 from pathlib import Path
+from typing import Optional
 
 import pytest
+from anyio import fail_after
 
+from bartender.async_utils import async_wrap
 from bartender.db.models.job_model import CompletedStates, State
-from bartender.filesystems.dirac import DiracFileSystem, DiracFileSystemConfig
+from bartender.filesystems.dirac import DiracFileSystem
 from bartender.schedulers.abstract import AbstractScheduler, JobDescription
 from bartender.schedulers.dirac import DiracScheduler, DiracSchedulerConfig
 from bartender.schedulers.runner import SshCommandRunner
 from bartender.shared.ssh import SshConnectConfig
 
 
-def prepare_input(job_dir: Path) -> JobDescription:
-    (job_dir / "input").write_text("Lorem ipsum")
+async def prepare_input(job_dir: Path) -> JobDescription:
+    await async_wrap((job_dir / "input").write_text)("Lorem ipsum")
     return JobDescription(
         command="echo -n hello && mkdir -p output && wc input > output/output.txt",
         job_dir=job_dir,
     )
 
 
-def assert_output(job_dir: Path) -> None:
-    assert (job_dir / "returncode").read_text() == "0"
-    assert (job_dir / "stdout.txt").read_text() == "hello"
-    assert (job_dir / "stderr.txt").read_text() == ""
-    assert (job_dir / "input").exists()
-    assert (job_dir / "output" / "output.txt").read_text().strip() == "0  2 11 input"
+async def read_texts(job_dir: Path, names: list[str]) -> dict[str, str]:
+    # Read in worker threads, so tasks on the event loop keep running
+    texts = await gather(
+        *(async_wrap((job_dir / name).read_text)() for name in names),
+    )
+    return dict(zip(names, texts))
+
+
+async def assert_output(job_dir: Path) -> None:
+    texts = await read_texts(
+        job_dir,
+        ["returncode", "stdout.txt", "stderr.txt", "output/output.txt"],
+    )
+    output = texts.pop("output/output.txt")
+    assert texts == {"returncode": "0", "stdout.txt": "hello", "stderr.txt": ""}
+    assert output.strip() == "0  2 11 input"
+    assert await async_wrap((job_dir / "input").exists)()
+
+
+def pending_jobs(states: dict[str, State]) -> list[str]:
+    return [job_id for job_id, state in states.items() if state not in CompletedStates]
+
+
+async def wait_for_jobs(
+    scheduler: AbstractScheduler,
+    job_ids: list[str],
+    delay: float = 0.1,
+    max_delay: float = 10,
+    timeout: float = 600,  # 10 minutes max runtime
+) -> dict[str, State]:
+    # Poll states of all pending jobs with a single call per attempt,
+    # backing off exponentially as most jobs take minutes
+    states = dict(zip(job_ids, await scheduler.states(job_ids)))
+    pending = pending_jobs(states)
+    try:
+        with fail_after(timeout):
+            while pending:
+                await sleep(delay)
+                delay = min(max_delay, delay * 1.5)
+                states.update(zip(pending, await scheduler.states(pending)))
+                pending = pending_jobs(states)
+    except TimeoutError:
+        # Do not leave stuck jobs behind to starve jobs of later tests
+        for job_id in pending:
+            await scheduler.cancel(job_id)
+        raise
+    return states
 
 
 async def wait_for_job(
     scheduler: AbstractScheduler,
     job_id: str,
     expected: State = "ok",
-    delay: float = 0.5,
-    attempts: int = 1200,  # 10 minutes max runtime
+    delay: float = 0.1,
+    timeout: float = 600,  # 10 minutes max runtime
 ) -> None:
-    state = "new"
-    for _ in range(attempts):
-        state = await scheduler.state(job_id)
-        if state in CompletedStates:
-            break
-        await sleep(delay)
+    states = await wait_for_jobs(scheduler, [job_id], delay=delay, timeout=timeout)
 
-    assert state == expected
+    assert states == {job_id: expected}
 
 
 @pytest.mark.anyio
 async def test_it(  # noqa: WPS217 single piece of code for readablilty
+    dirac_fs: DiracFileSystem,
+    dirac_scheduler: DiracScheduler,
     tmp_path: Path,
 ) -> None:
     """Happy path test of the DIRAC scheduler and filesystem.
@@ -61,18 +103,13 @@ async def test_it(  # noqa: WPS217 single piece of code for readablilty
     rm /tutoVO/user/c/ciuser/bartenderjobs/job1/output.tar
     rmdir /tutoVO/user/c/ciuser/bartenderjobs/job1
     """
-    fs_config = DiracFileSystemConfig(
-        lfn_root="/tutoVO/user/c/ciuser/bartenderjobs",
-        storage_element="StorageElementOne",
-    )
-    fs = DiracFileSystem(fs_config)
-    sched_config = DiracSchedulerConfig(storage_element=fs_config.storage_element)
-    scheduler = DiracScheduler(sched_config)
+    fs = dirac_fs
+    scheduler = dirac_scheduler
     # emulate external job id with job1 subdir
     # job_dir.name is used as directory to upload inputfiles to lfn_root
     job_dir = tmp_path / "job1"
     job_dir.mkdir()
-    description = prepare_input(job_dir)
+    description = await prepare_input(job_dir)
     gdescription = fs.localize_description(description, tmp_path)
     try:
         await fs.upload(description, gdescription)
@@ -85,46 +122,58 @@ async def test_it(  # noqa: WPS217 single piece of code for readablilty
 
         await fs.download(gdescription, description)
 
-        assert_output(job_dir)
+        await assert_output(job_dir)
     finally:
         # So next time the test does not complain about existing files
         await fs.delete(gdescription)
-        await fs.close()
-        await scheduler.close()
 
 
 @pytest.fixture(scope="session")
 async def apptainer_image() -> Path:
-    """Adds alpine.sif to DIRAC server.
+    """Adds alpine.sif to DIRAC server, unless it is already there.
+
+    Set BARTENDER_REBUILD_APPTAINER=1 environment variable to rebuild the image.
 
     Raises:
         RuntimeError: If the image could not be built.
     """
-    runner = SshCommandRunner(
+    docker_image = "docker://alpine"
+    image = Path("/cvmfs/my.repo.name/applications/alpine.sif")
+    # One ssh connection is used for all commands and closed afterwards
+    with SshCommandRunner(
         SshConnectConfig(  # noqa: S106 container has password hardcoded
             hostname="dirac-tuto",
             username="diracuser",
             password="password",
         ),
-    )
-    docker_image = "docker://alpine"
-    image = Path("/cvmfs/my.repo.name/applications/alpine.sif")
-    mkdir_returncode, _, _ = await runner.run(
-        command="mkdir",
-        args=["-p", str(image.parent)],
-    )
-    if mkdir_returncode:
-        raise RuntimeError(f"Failed to mkdir {image.parent}")
-    cmd = f". /opt/dirac/bashrc && apptainer build --force {image.name} {docker_image}"
-    build_returncode, _, _ = await runner.run(
-        command="bash",
-        args=[],
-        stdin=cmd,
-        cwd=image.parent,
-    )
-    if build_returncode:
-        raise RuntimeError(f"Failed to build {image}")
-    return image
+    ) as runner:
+        # Reuse non-empty image built by an earlier session,
+        # unless a rebuild is requested
+        rebuild = os.environ.get("BARTENDER_REBUILD_APPTAINER") == "1"
+        if not rebuild:
+            exists_returncode, _, _ = await runner.run(
+                command="test",
+                args=["-s", str(image)],
+            )
+            if not exists_returncode:
+                return image
+        # Create directory in same ssh session as build to save a round trip
+        cmd = " && ".join(
+            [
+                f"mkdir -p {image.parent}",
+                f"cd {image.parent}",
+                ". /opt/dirac/bashrc",
+                f"apptainer build --force {image.name} {docker_image}",
+            ],
+        )
+        build_returncode, _, _ = await runner.run(
+            command="bash",
+            args=[],
+            stdin=cmd,
+        )
+        if build_returncode:
+            raise RuntimeError(f"Failed to build {image}")
+        return image
 
 
 # Skip test
@@ -143,17 +192,16 @@ async def apptainer_image() -> Path:
 )
 async def test_it_with_apptainer(  # noqa: WPS217 single piece of code for readablilty
     apptainer_image: Path,
+    dirac_fs: DiracFileSystem,
     tmp_path: Path,
 ) -> None:
-    fs_config = DiracFileSystemConfig(
-        lfn_root="/tutoVO/user/c/ciuser/bartenderjobs",
-        storage_element="StorageElementOne",
-    )
-    fs = DiracFileSystem(fs_config)
+    fs = dirac_fs
     sched_config = DiracSchedulerConfig(
-        storage_element=fs_config.storage_element,
+        storage_element=fs.storage_element,
         apptainer_image=apptainer_image,
     )
+    # Not closed, as closing would tear down the proxy renewer
+    # shared with the module fixtures
     scheduler = DiracScheduler(sched_config)
     job_dir = tmp_path / "job2"
     job_dir.mkdir()
@@ -176,23 +224,21 @@ async def test_it_with_apptainer(  # noqa: WPS217 single piece of code for reada
 
         await fs.download(gdescription, description)
 
-        assert "Alpine Linux" in (job_dir / "stdout.txt").read_text()
+        texts = await read_texts(job_dir, ["stdout.txt"])
+        assert "Alpine Linux" in texts["stdout.txt"]
     finally:
         # So next time the test does not complain about existing files
         await fs.delete(gdescription)
-        await fs.close()
-        await scheduler.close()
 
 
 @pytest.mark.anyio
-async def test_states_and_cancel(tmp_path: Path) -> None:  # noqa: WPS217 readablilty
-    fs_config = DiracFileSystemConfig(
-        lfn_root="/tutoVO/user/c/ciuser/bartenderjobs",
-        storage_element="StorageElementOne",
-    )
-    fs = DiracFileSystem(fs_config)
-    sched_config = DiracSchedulerConfig(storage_element=fs_config.storage_element)
-    scheduler = DiracScheduler(sched_config)
+async def test_states_and_cancel(  # noqa: WPS217 readablilty
+    dirac_fs: DiracFileSystem,
+    dirac_scheduler: DiracScheduler,
+    tmp_path: Path,
+) -> None:
+    fs = dirac_fs
+    scheduler = dirac_scheduler
     job_dir = tmp_path / "job3"
     job_dir.mkdir()
     description = JobDescription(
@@ -217,21 +263,35 @@ async def test_states_and_cancel(tmp_path: Path) -> None:  # noqa: WPS217 readab
     finally:
         # So next time the test does not complain about existing files
         await fs.delete(gdescription)
-        await fs.close()
-        await scheduler.close()
+
+
+async def fetch_logs_and_output(
+    scheduler: DiracScheduler,
+    fs: DiracFileSystem,
+    job_id: str,
+    gdescription: JobDescription,
+    description: JobDescription,
+) -> tuple[tuple[str, str], Optional[BaseException]]:
+    # Logs come from the job service and output from grid storage,
+    # so fetch them concurrently.
+    # Wait for both, so the download is never left running
+    # when fetching the logs fails.
+    logs = create_task(scheduler.logs(job_id, description.job_dir))
+    download = create_task(fs.download(gdescription, description))
+    await wait([logs, download])
+    # Retrieve download error before logs result can raise
+    download_error = download.exception()
+    return logs.result(), download_error
 
 
 @pytest.mark.anyio
-async def test_failing_job(  # noqa: WPS217 single piece of code for readablilty
+async def test_failing_job(  # noqa: WPS217, WPS218 single piece of code for readablilty
+    dirac_fs: DiracFileSystem,
+    dirac_scheduler: DiracScheduler,
     tmp_path: Path,
 ) -> None:
-    fs_config = DiracFileSystemConfig(
-        lfn_root="/tutoVO/user/c/ciuser/bartenderjobs",
-        storage_element="StorageElementOne",
-    )
-    fs = DiracFileSystem(fs_config)
-    sched_config = DiracSchedulerConfig(storage_element=fs_config.storage_element)
-    scheduler = DiracScheduler(sched_config)
+    fs = dirac_fs
+    scheduler = dirac_scheduler
     # emulate external job id with job1 subdir
     # job_dir.name is used as directory to upload inputfiles to lfn_root
     job_dir = tmp_path / "job4"
@@ -250,14 +310,20 @@ async def test_failing_job(  # noqa: WPS217 single piece of code for readablilty
 
         await wait_for_job(scheduler, job_id, expected="error")
 
-        stdout, stderr = await scheduler.logs(job_id, description.job_dir)
+        (stdout, stderr), download_error = await fetch_logs_and_output(
+            scheduler,
+            fs,
+            job_id,
+            gdescription,
+            description,
+        )
 
         assert "icannotwork" in stdout
         assert "idonotexist" in stderr
 
-        with pytest.raises(FileNotFoundError, match="output.tar"):
-            # a failed job does to get its output.tar uploaded to grid storage
-            await fs.download(gdescription, description)
+        # a failed job does to get its output.tar uploaded to grid storage
+        assert isinstance(download_error, FileNotFoundError)
+        assert "output.tar" in str(download_error)
 
         files_in_job_dir = list(job_dir.iterdir())
         # stdout.txt and stderr.txt, which is side effect of logs()
@@ -265,19 +331,14 @@ async def test_failing_job(  # noqa: WPS217 single piece of code for readablilty
     finally:
         # So next time the test does not complain about existing files
         await fs.delete(gdescription)
-        await fs.close()
-        await scheduler.close()
 
 
 @pytest.mark.anyio
 async def test_filesystem_delete(
+    dirac_fs: DiracFileSystem,
     tmp_path: Path,
 ) -> None:
-    fs_config = DiracFileSystemConfig(
-        lfn_root="/tutoVO/user/c/ciuser/bartenderjobs",
-        storage_element="StorageElementOne",
-    )
-    fs = DiracFileSystem(fs_config)
+    fs = dirac_fs
 
     job_dir = tmp_path / "job1"
     job_dir.mkdir()
@@ -289,33 +350,32 @@ async def test_filesystem_delete(
     )
     gdescription = fs.localize_description(description, tmp_path)
 
-    try:
-        # A completed job will have a input.tar and output.tar on grid storage.
-        # need to use dirac data manager
-        # as DiracFileSystem does not allow uploading random files
-        input_put_result = fs.dm.putAndRegister(
-            lfn=str(gdescription.job_dir / "input.tar"),
-            fileName=str(description.job_dir / "input.tar"),
-            diracSE=fs.storage_element,
-        )
-        assert input_put_result["OK"] and not input_put_result["Value"]["Failed"]
-        output_put_result = fs.dm.putAndRegister(
-            lfn=str(gdescription.job_dir / "output.tar"),
-            fileName=str(description.job_dir / "output.tar"),
-            diracSE=fs.storage_element,
-        )
-        assert output_put_result["OK"] and not input_put_result["Value"]["Failed"]
+    # A completed job will have a input.tar and output.tar on grid storage.
+    # need to use dirac data manager
+    # as DiracFileSystem does not allow uploading random files
+    # The uploads are independent, so transfer them concurrently
+    put = async_wrap(fs.dm.putAndRegister)
+    put_results = await gather(
+        *(
+            put(
+                lfn=str(gdescription.job_dir / archive),
+                fileName=str(description.job_dir / archive),
+                diracSE=fs.storage_element,
+            )
+            for archive in ("input.tar", "output.tar")
+        ),
+    )
+    for put_result in put_results:
+        assert put_result["OK"] and not put_result["Value"]["Failed"]
 
-        await fs.delete(gdescription)
+    await fs.delete(gdescription)
 
-        # Unable to get files after deletion of job dir on grid storage.
-        input_get_result = fs.dm.getFile(
-            str(gdescription.job_dir / "input.tar"),
-            tmp_path,
-        )
-        input_get_error = list(input_get_result["Value"]["Failed"].values()).pop()
-        assert input_get_error == "No such file or directory"
-        with pytest.raises(FileNotFoundError, match="output.tar"):
-            await fs.download(gdescription, description)
-    finally:
-        await fs.close()
+    # Unable to get files after deletion of job dir on grid storage.
+    input_get_result = fs.dm.getFile(
+        str(gdescription.job_dir / "input.tar"),
+        tmp_path,
+    )
+    input_get_error = list(input_get_result["Value"]["Failed"].values()).pop()
+    assert input_get_error == "No such file or directory"
+    with pytest.raises(FileNotFoundError, match="output.tar"):
+        await fs.download(gdescription, description)
@@ -22,15 +22,20 @@ def destroy_proxy() -> None:
     )
 
 
-@pytest.fixture
-async def reset_proxy() -> AsyncGenerator[None, None]:
-    destroy_proxy()
+@pytest.fixture(scope="module")
+async def _default_proxy() -> AsyncGenerator[None, None]:
     yield
     await proxy_init(ProxyConfig())
 
 
-# All tests in this module should
-# start with no proxy and leave default proxy behind
+@pytest.fixture
+def reset_proxy(_default_proxy: None) -> None:
+    destroy_proxy()
+
+
+# All tests in this module should start with no proxy and
+# the module should leave default proxy behind.
+# Next test destroys the proxy anyway, so it is only created once at the end.
 pytestmark = pytest.mark.usefixtures("reset_proxy")
 
 